@@ -9,25 +9,33 @@ from lib.args import Args, parse_args
 from lib.log import Log
 from lib.git import Git, cleanup_stash
 
+# Hoisted so each result check is a single global lookup
+_FAILED = Git.Result.FAILED
 
-def _done_flow(log: Log, git: Git) -> int:
+
+def _done_flow(log: Log, git: Git, check_stash: bool = True) -> int:
     """
     Amends the current commit with staged changes and continues the rebase.
+
+    If check_stash is disabled, the leftover stash entry check is skipped. The
+    stash flow does this once the stash was popped cleanly, since the entry is
+    already gone.
     """
     # Amend the current commit
-    if git.amend_commit() == Git.Result.FAILED:
+    if git.amend_commit() == _FAILED:
         log.error("Error: Failed to amend the current commit.")
         return 1
 
     # Continue the rebase
-    if git.continue_rebase() == Git.Result.FAILED:
+    if git.continue_rebase() == _FAILED:
         log.error("Error: Failed to finish rebase.")
         log.error("Error: + Fix any conflicts, then run 'git re --done'.")
         log.error("Error: + To cancel the rebase, run 'git re --abort'.")
         return 1
 
     # Stash flow: if the stash entry is left over, remove it
-    cleanup_stash(git, log)
+    if check_stash:
+        cleanup_stash(git, log)
 
     # Success
     log.info("Successfully amended commit and continued rebase.")
@@ -42,7 +50,10 @@ def _edit_flow(args: Args, log: Log, git: Git) -> int:
     """
     # Stash mode: push staged changes to stash
     if args.stash:
-        if git.has_staged() == Git.Result.FAILED:
+        # Checked up front rather than inferred from 'git stash push': with
+        # --keep-index it exits 0 both when nothing changed and when only
+        # unstaged changes exist, stashing those instead.
+        if git.has_staged() == _FAILED:
             log.error(
                 "Error: No staged files. Stage your changes with 'git add' before using --stash."
             )
@@ -50,18 +61,18 @@ def _edit_flow(args: Args, log: Log, git: Git) -> int:
         
         cleanup_stash(git, log)
 
-        if git.stash_staged() == Git.Result.FAILED:
+        if git.stash_staged() == _FAILED:
             log.error("Error: Failed to stash staged changes.")
             return 1
 
     # Start interactive rebase
-    if git.rebase_edit(args.commit) == Git.Result.FAILED:
+    if git.rebase_edit(args.commit) == _FAILED:
         log.error("Error: Failed to start interactive rebase.")
 
         # Try to restore the stash
         if args.stash:
             log.debug("Restoring stash...")
-            if git.pop_stash() == Git.Result.FAILED:
+            if git.pop_stash() == _FAILED:
                 # If it failed, the least we can do is inform the user
                 log.error("Error: + Failed to restore stash after rebase failure.")
                 log.error(
@@ -72,7 +83,7 @@ def _edit_flow(args: Args, log: Log, git: Git) -> int:
 
     # Stash mode: pop stash, continue to done flow
     if args.stash:
-        if git.pop_stash() == Git.Result.FAILED:
+        if git.pop_stash() == _FAILED:
             log.error(
                 "Error: Failed to apply stash to commit. The changes are saved in the stash."
             )
@@ -80,7 +91,8 @@ def _edit_flow(args: Args, log: Log, git: Git) -> int:
             log.error("Error: + To cancel the rebase, run 'git re --abort'.")
             return 1
 
-        return _done_flow(log, git)
+        # A clean pop already dropped the stash entry
+        return _done_flow(log, git, check_stash=False)
 
     # Success
     log.info("Rebase-editing. Stage your changes, then run 'git re --done'.")
@@ -92,7 +104,7 @@ def _abort_flow(log: Log, git: Git) -> int:
     Aborts the current rebase operation.
     """
     # Abort the rebase
-    if git.abort_rebase() == Git.Result.FAILED:
+    if git.abort_rebase() == _FAILED:
         log.error("Error: Failed to abort rebase.")
         return 1
 
@@ -1,186 +1,136 @@
+from types import SimpleNamespace
 import unittest
 from unittest.mock import MagicMock, patch
 
 from lib.git import Git
+from lib.testing import make_mock_git
 
+import git_re
 from git_re import main, _abort_flow, _done_flow, _edit_flow
 
 
 class MainTest(unittest.TestCase):
     """Tests for the main() function argument validation and flow dispatch."""
 
-    @patch("git_re.Git")
-    @patch("git_re.Log")
-    @patch("git_re.parse_args")
-    def test_abort_with_commit_errors(self, mock_parse_args, mock_log_cls, mock_git_cls):
-        """
-        Tests that --abort with a commit argument produces an error.
-        """
-        mock_args = MagicMock(abort=True, done=False, commit="abc123", stash=False)
-        mock_parse_args.return_value = mock_args
-        mock_log = mock_log_cls.return_value
-
-        result = main()
-
-        self.assertEqual(result, 1)
-        mock_log.error.assert_called_once()
-        self.assertIn("--abort", mock_log.error.call_args[0][0])
-        self.assertIn("commit", mock_log.error.call_args[0][0])
-
-    @patch("git_re.Git")
-    @patch("git_re.Log")
-    @patch("git_re.parse_args")
-    def test_abort_with_stash_errors(self, mock_parse_args, mock_log_cls, mock_git_cls):
-        """
-        Tests that --abort with --stash produces an error.
-        """
-        mock_args = MagicMock(abort=True, done=False, commit=None, stash=True)
-        mock_parse_args.return_value = mock_args
-        mock_log = mock_log_cls.return_value
-
-        result = main()
-
-        self.assertEqual(result, 1)
-        mock_log.error.assert_called_once()
-        self.assertIn("--abort", mock_log.error.call_args[0][0])
-        self.assertIn("--stash", mock_log.error.call_args[0][0])
-
-    @patch("git_re.Git")
-    @patch("git_re.Log")
-    @patch("git_re.parse_args")
-    def test_abort_with_done_errors(self, mock_parse_args, mock_log_cls, mock_git_cls):
-        """
-        Tests that --abort with --done produces an error.
-        """
-        mock_args = MagicMock(abort=True, done=True, commit=None, stash=False)
-        mock_parse_args.return_value = mock_args
-        mock_log = mock_log_cls.return_value
-
-        result = main()
-
-        self.assertEqual(result, 1)
-        mock_log.error.assert_called_once()
-        self.assertIn("--abort", mock_log.error.call_args[0][0])
-        self.assertIn("--done", mock_log.error.call_args[0][0])
-
-    @patch("git_re.Git")
-    @patch("git_re.Log")
-    @patch("git_re.parse_args")
-    def test_done_with_commit_errors(self, mock_parse_args, mock_log_cls, mock_git_cls):
-        """
-        Tests that --done with a commit argument produces an error.
-        """
-        mock_args = MagicMock(abort=False, done=True, commit="abc123", stash=False)
-        mock_parse_args.return_value = mock_args
-        mock_log = mock_log_cls.return_value
-
-        result = main()
-
-        self.assertEqual(result, 1)
-        mock_log.error.assert_called_once()
-        self.assertIn("--done", mock_log.error.call_args[0][0])
-        self.assertIn("commit", mock_log.error.call_args[0][0])
-
-    @patch("git_re.Git")
-    @patch("git_re.Log")
-    @patch("git_re.parse_args")
-    def test_done_with_stash_errors(self, mock_parse_args, mock_log_cls, mock_git_cls):
-        """
-        Tests that --done with --stash produces an error.
-        """
-        mock_args = MagicMock(abort=False, done=True, commit=None, stash=True)
-        mock_parse_args.return_value = mock_args
-        mock_log = mock_log_cls.return_value
-
-        result = main()
-
-        self.assertEqual(result, 1)
-        mock_log.error.assert_called_once()
-        self.assertIn("--done", mock_log.error.call_args[0][0])
-        self.assertIn("--stash", mock_log.error.call_args[0][0])
-
-    @patch("git_re._abort_flow")
-    @patch("git_re.Git")
-    @patch("git_re.Log")
-    @patch("git_re.parse_args")
-    def test_dispatches_to_abort_flow(
-        self, mock_parse_args, mock_log_cls, mock_git_cls, mock_abort_flow
-    ):
+    def setUp(self):
+        self.mock_git_cls = self._start_patch("Git")
+        self.mock_log_cls = self._start_patch("Log")
+        self.mock_parse_args = self._start_patch("parse_args")
+
+    def _start_patch(self, attribute: str) -> MagicMock:
+        """
+        Patches the git_re attribute for the duration of the current test.
+        """
+        patcher = patch.object(git_re, attribute)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def test_conflicting_flags_error(self):
+        """
+        Tests that conflicting arguments produce a single error naming both.
+        """
+        cases = [
+            (
+                dict(abort=True, done=False, commit="abc123", stash=False),
+                ("--abort", "commit"),
+            ),
+            (
+                dict(abort=True, done=False, commit=None, stash=True),
+                ("--abort", "--stash"),
+            ),
+            (
+                dict(abort=True, done=True, commit=None, stash=False),
+                ("--abort", "--done"),
+            ),
+            (
+                dict(abort=False, done=True, commit="abc123", stash=False),
+                ("--done", "commit"),
+            ),
+            (
+                dict(abort=False, done=True, commit=None, stash=True),
+                ("--done", "--stash"),
+            ),
+        ]
+
+        for kwargs, expected in cases:
+            with self.subTest(**kwargs):
+                self.mock_parse_args.return_value = SimpleNamespace(**kwargs)
+                mock_log = self.mock_log_cls.return_value
+                mock_log.reset_mock()
+
+                result = main()
+
+                self.assertEqual(result, 1)
+                mock_log.error.assert_called_once()
+                for token in expected:
+                    self.assertIn(token, mock_log.error.call_args[0][0])
+
+    @patch.object(git_re, "_abort_flow")
+    def test_dispatches_to_abort_flow(self, mock_abort_flow):
         """
         Tests that valid --abort dispatches to _abort_flow.
         """
-        mock_args = MagicMock(abort=True, done=False, commit=None, stash=False)
-        mock_parse_args.return_value = mock_args
+        mock_args = SimpleNamespace(abort=True, done=False, commit=None, stash=False)
+        self.mock_parse_args.return_value = mock_args
         mock_abort_flow.return_value = 0
 
         result = main()
 
         self.assertEqual(result, 0)
         mock_abort_flow.assert_called_once_with(
-            mock_log_cls.return_value, mock_git_cls.return_value
+            self.mock_log_cls.return_value, self.mock_git_cls.return_value
         )
 
-    @patch("git_re._done_flow")
-    @patch("git_re.Git")
-    @patch("git_re.Log")
-    @patch("git_re.parse_args")
-    def test_dispatches_to_done_flow(
-        self, mock_parse_args, mock_log_cls, mock_git_cls, mock_done_flow
-    ):
+    @patch.object(git_re, "_done_flow")
+    def test_dispatches_to_done_flow(self, mock_done_flow):
         """
         Tests that valid --done dispatches to _done_flow.
         """
-        mock_args = MagicMock(abort=False, done=True, commit=None, stash=False)
-        mock_parse_args.return_value = mock_args
+        mock_args = SimpleNamespace(abort=False, done=True, commit=None, stash=False)
+        self.mock_parse_args.return_value = mock_args
         mock_done_flow.return_value = 0
 
         result = main()
 
         self.assertEqual(result, 0)
         mock_done_flow.assert_called_once_with(
-            mock_log_cls.return_value, mock_git_cls.return_value
+            self.mock_log_cls.return_value, self.mock_git_cls.return_value
         )
 
-    @patch("git_re._edit_flow")
-    @patch("git_re.Git")
-    @patch("git_re.Log")
-    @patch("git_re.parse_args")
-    def test_dispatches_to_edit_flow(
-        self, mock_parse_args, mock_log_cls, mock_git_cls, mock_edit_flow
-    ):
+    @patch.object(git_re, "_edit_flow")
+    def test_dispatches_to_edit_flow(self, mock_edit_flow):
         """
         Tests that default invocation dispatches to _edit_flow.
         """
-        mock_args = MagicMock(abort=False, done=False, commit="abc123", stash=False)
-        mock_parse_args.return_value = mock_args
+        mock_args = SimpleNamespace(
+            abort=False, done=False, commit="abc123", stash=False
+        )
+        self.mock_parse_args.return_value = mock_args
         mock_edit_flow.return_value = 0
 
         result = main()
 
         self.assertEqual(result, 0)
         mock_edit_flow.assert_called_once_with(
-            mock_args, mock_log_cls.return_value, mock_git_cls.return_value
+            mock_args, self.mock_log_cls.return_value, self.mock_git_cls.return_value
         )
 
-    @patch("git_re._edit_flow")
-    @patch("git_re.Git")
-    @patch("git_re.Log")
-    @patch("git_re.parse_args")
-    def test_dispatches_to_edit_flow_with_stash(
-        self, mock_parse_args, mock_log_cls, mock_git_cls, mock_edit_flow
-    ):
+    @patch.object(git_re, "_edit_flow")
+    def test_dispatches_to_edit_flow_with_stash(self, mock_edit_flow):
         """
         Tests that invocation with --stash dispatches to _edit_flow with stash enabled.
         """
-        mock_args = MagicMock(abort=False, done=False, commit="abc123", stash=True)
-        mock_parse_args.return_value = mock_args
+        mock_args = SimpleNamespace(
+            abort=False, done=False, commit="abc123", stash=True
+        )
+        self.mock_parse_args.return_value = mock_args
         mock_edit_flow.return_value = 0
 
         result = main()
 
         self.assertEqual(result, 0)
         mock_edit_flow.assert_called_once_with(
-            mock_args, mock_log_cls.return_value, mock_git_cls.return_value
+            mock_args, self.mock_log_cls.return_value, self.mock_git_cls.return_value
         )
         # Verify stash flag is passed through in args
         self.assertTrue(mock_edit_flow.call_args[0][0].stash)
@@ -193,9 +143,7 @@ class AbortFlowTest(unittest.TestCase):
         """
         Tests the happy path where abort_rebase succeeds.
         """
-        mock_git = MagicMock()
-        mock_git.abort_rebase.return_value = Git.Result.SUCCESS
-        mock_git.stash_list.return_value = ""
+        mock_git = make_mock_git()
         mock_log = MagicMock()
 
         result = _abort_flow(mock_log, mock_git)
@@ -209,7 +157,7 @@ class AbortFlowTest(unittest.TestCase):
         """
         Tests the case where abort_rebase fails.
         """
-        mock_git = MagicMock()
+        mock_git = make_mock_git()
         mock_git.abort_rebase.return_value = Git.Result.FAILED
         mock_log = MagicMock()
 
@@ -225,9 +173,7 @@ class AbortFlowTest(unittest.TestCase):
         """
         Tests that cleanup_stash is called after successful abort.
         """
-        mock_git = MagicMock()
-        mock_git.abort_rebase.return_value = Git.Result.SUCCESS
-        mock_git.stash_list.return_value = ""  # No leftover stash
+        mock_git = make_mock_git()
         mock_log = MagicMock()
 
         _abort_flow(mock_log, mock_git)
@@ -242,10 +188,7 @@ class DoneFlowTest(unittest.TestCase):
         """
         Tests the happy path where amend and continue succeed.
         """
-        mock_git = MagicMock()
-        mock_git.amend_commit.return_value = Git.Result.SUCCESS
-        mock_git.continue_rebase.return_value = Git.Result.SUCCESS
-        mock_git.stash_list.return_value = ""  # No leftover stash
+        mock_git = make_mock_git()
         mock_log = MagicMock()
 
         result = _done_flow(mock_log, mock_git)
@@ -260,7 +203,7 @@ class DoneFlowTest(unittest.TestCase):
         """
         Tests the case where amend_commit fails.
         """
-        mock_git = MagicMock()
+        mock_git = make_mock_git()
         mock_git.amend_commit.return_value = Git.Result.FAILED
         mock_log = MagicMock()
 
@@ -276,8 +219,7 @@ class DoneFlowTest(unittest.TestCase):
         """
         Tests the case where continue_rebase fails after successful amend.
         """
-        mock_git = MagicMock()
-        mock_git.amend_commit.return_value = Git.Result.SUCCESS
+        mock_git = make_mock_git()
         mock_git.continue_rebase.return_value = Git.Result.FAILED
         mock_log = MagicMock()
 
@@ -288,25 +230,33 @@ class DoneFlowTest(unittest.TestCase):
         mock_git.continue_rebase.assert_called_once()
         # Should log 3 error messages with recovery instructions
         self.assertEqual(mock_log.error.call_count, 3)
-        error_messages = [call[0][0] for call in mock_log.error.call_args_list]
-        self.assertTrue(any("rebase" in msg.lower() for msg in error_messages))
-        self.assertTrue(any("--done" in msg for msg in error_messages))
-        self.assertTrue(any("--abort" in msg for msg in error_messages))
+        error_log = "\n".join(c.args[0] for c in mock_log.error.call_args_list).lower()
+        for token in ("rebase", "--done", "--abort"):
+            self.assertIn(token, error_log)
 
     def test_cleanup_stash_called_on_success(self):
         """
         Tests that cleanup_stash is called after successful done flow.
         """
-        mock_git = MagicMock()
-        mock_git.amend_commit.return_value = Git.Result.SUCCESS
-        mock_git.continue_rebase.return_value = Git.Result.SUCCESS
-        mock_git.stash_list.return_value = ""
+        mock_git = make_mock_git()
         mock_log = MagicMock()
 
         _done_flow(mock_log, mock_git)
 
         mock_git.stash_list.assert_called_once()
 
+    def test_cleanup_stash_skipped(self):
+        """
+        Tests that cleanup_stash is skipped when check_stash is disabled.
+        """
+        mock_git = make_mock_git()
+        mock_log = MagicMock()
+
+        result = _done_flow(mock_log, mock_git, check_stash=False)
+
+        self.assertEqual(result, 0)
+        mock_git.stash_list.assert_not_called()
+
 
 class EditFlowTest(unittest.TestCase):
     """Tests for the _edit_flow function."""
@@ -315,9 +265,8 @@ class EditFlowTest(unittest.TestCase):
         """
         Tests the happy path without stash mode.
         """
-        mock_args = MagicMock(stash=False, commit="abc123")
-        mock_git = MagicMock()
-        mock_git.rebase_edit.return_value = Git.Result.SUCCESS
+        mock_args = SimpleNamespace(stash=False, commit="abc123")
+        mock_git = make_mock_git()
         mock_log = MagicMock()
 
         result = _edit_flow(mock_args, mock_log, mock_git)
@@ -331,8 +280,8 @@ class EditFlowTest(unittest.TestCase):
         """
         Tests when rebase_edit fails without stash mode.
         """
-        mock_args = MagicMock(stash=False, commit="abc123")
-        mock_git = MagicMock()
+        mock_args = SimpleNamespace(stash=False, commit="abc123")
+        mock_git = make_mock_git()
         mock_git.rebase_edit.return_value = Git.Result.FAILED
         mock_log = MagicMock()
 
@@ -348,8 +297,8 @@ class EditFlowTest(unittest.TestCase):
         """
         Tests stash mode when there are no staged files.
         """
-        mock_args = MagicMock(stash=True, commit="abc123")
-        mock_git = MagicMock()
+        mock_args = SimpleNamespace(stash=True, commit="abc123")
+        mock_git = make_mock_git()
         mock_git.has_staged.return_value = Git.Result.FAILED
         mock_log = MagicMock()
 
@@ -366,10 +315,8 @@ class EditFlowTest(unittest.TestCase):
         """
         Tests stash mode when stash_staged fails.
         """
-        mock_args = MagicMock(stash=True, commit="abc123")
-        mock_git = MagicMock()
-        mock_git.has_staged.return_value = Git.Result.SUCCESS
-        mock_git.stash_list.return_value = ""  # cleanup_stash finds nothing
+        mock_args = SimpleNamespace(stash=True, commit="abc123")
+        mock_git = make_mock_git()
         mock_git.stash_staged.return_value = Git.Result.FAILED
         mock_log = MagicMock()
 
@@ -386,13 +333,9 @@ class EditFlowTest(unittest.TestCase):
         """
         Tests stash mode when rebase fails but pop_stash succeeds to restore.
         """
-        mock_args = MagicMock(stash=True, commit="abc123")
-        mock_git = MagicMock()
-        mock_git.has_staged.return_value = Git.Result.SUCCESS
-        mock_git.stash_list.return_value = ""
-        mock_git.stash_staged.return_value = Git.Result.SUCCESS
+        mock_args = SimpleNamespace(stash=True, commit="abc123")
+        mock_git = make_mock_git()
         mock_git.rebase_edit.return_value = Git.Result.FAILED
-        mock_git.pop_stash.return_value = Git.Result.SUCCESS
         mock_log = MagicMock()
 
         result = _edit_flow(mock_args, mock_log, mock_git)
@@ -407,11 +350,8 @@ class EditFlowTest(unittest.TestCase):
         """
         Tests stash mode when rebase fails and pop_stash also fails.
         """
-        mock_args = MagicMock(stash=True, commit="abc123")
-        mock_git = MagicMock()
-        mock_git.has_staged.return_value = Git.Result.SUCCESS
-        mock_git.stash_list.return_value = ""
-        mock_git.stash_staged.return_value = Git.Result.SUCCESS
+        mock_args = SimpleNamespace(stash=True, commit="abc123")
+        mock_git = make_mock_git()
         mock_git.rebase_edit.return_value = Git.Result.FAILED
         mock_git.pop_stash.return_value = Git.Result.FAILED
         mock_log = MagicMock()
@@ -423,20 +363,16 @@ class EditFlowTest(unittest.TestCase):
         mock_git.pop_stash.assert_called_once()
         # Should log rebase error + 2 stash recovery errors
         self.assertEqual(mock_log.error.call_count, 3)
-        error_messages = [call[0][0] for call in mock_log.error.call_args_list]
-        self.assertTrue(any("rebase" in msg.lower() for msg in error_messages))
-        self.assertTrue(any("stash" in msg.lower() for msg in error_messages))
+        error_log = "\n".join(c.args[0] for c in mock_log.error.call_args_list).lower()
+        for token in ("rebase", "stash"):
+            self.assertIn(token, error_log)
 
     def test_stash_mode_rebase_succeeds_pop_fails(self):
         """
         Tests stash mode when rebase succeeds but pop_stash fails.
         """
-        mock_args = MagicMock(stash=True, commit="abc123")
-        mock_git = MagicMock()
-        mock_git.has_staged.return_value = Git.Result.SUCCESS
-        mock_git.stash_list.return_value = ""
-        mock_git.stash_staged.return_value = Git.Result.SUCCESS
-        mock_git.rebase_edit.return_value = Git.Result.SUCCESS
+        mock_args = SimpleNamespace(stash=True, commit="abc123")
+        mock_git = make_mock_git()
         mock_git.pop_stash.return_value = Git.Result.FAILED
         mock_log = MagicMock()
 
@@ -447,23 +383,17 @@ class EditFlowTest(unittest.TestCase):
         mock_git.pop_stash.assert_called_once()
         # Should log 3 error messages with recovery instructions
         self.assertEqual(mock_log.error.call_count, 3)
-        error_messages = [call[0][0] for call in mock_log.error.call_args_list]
-        self.assertTrue(any("stash" in msg.lower() for msg in error_messages))
-        self.assertTrue(any("--done" in msg for msg in error_messages))
-        self.assertTrue(any("--abort" in msg for msg in error_messages))
+        error_log = "\n".join(c.args[0] for c in mock_log.error.call_args_list).lower()
+        for token in ("stash", "--done", "--abort"):
+            self.assertIn(token, error_log)
 
-    @patch("git_re._done_flow")
+    @patch.object(git_re, "_done_flow")
     def test_stash_mode_full_success(self, mock_done_flow):
         """
         Tests stash mode happy path - all operations succeed, _done_flow is called.
         """
-        mock_args = MagicMock(stash=True, commit="abc123")
-        mock_git = MagicMock()
-        mock_git.has_staged.return_value = Git.Result.SUCCESS
-        mock_git.stash_list.return_value = ""
-        mock_git.stash_staged.return_value = Git.Result.SUCCESS
-        mock_git.rebase_edit.return_value = Git.Result.SUCCESS
-        mock_git.pop_stash.return_value = Git.Result.SUCCESS
+        mock_args = SimpleNamespace(stash=True, commit="abc123")
+        mock_git = make_mock_git()
         mock_log = MagicMock()
         mock_done_flow.return_value = 0
 
@@ -474,41 +404,29 @@ class EditFlowTest(unittest.TestCase):
         mock_git.stash_staged.assert_called_once()
         mock_git.rebase_edit.assert_called_once_with("abc123")
         mock_git.pop_stash.assert_called_once()
-        mock_done_flow.assert_called_once_with(mock_log, mock_git)
+        mock_done_flow.assert_called_once_with(mock_log, mock_git, check_stash=False)
 
-    @patch("git_re._done_flow")
+    @patch.object(git_re, "_done_flow")
     def test_stash_mode_done_flow_fails(self, mock_done_flow):
         """
         Tests stash mode when _done_flow returns failure.
         """
-        mock_args = MagicMock(stash=True, commit="abc123")
-        mock_git = MagicMock()
-        mock_git.has_staged.return_value = Git.Result.SUCCESS
-        mock_git.stash_list.return_value = ""
-        mock_git.stash_staged.return_value = Git.Result.SUCCESS
-        mock_git.rebase_edit.return_value = Git.Result.SUCCESS
-        mock_git.pop_stash.return_value = Git.Result.SUCCESS
+        mock_args = SimpleNamespace(stash=True, commit="abc123")
+        mock_git = make_mock_git()
         mock_log = MagicMock()
         mock_done_flow.return_value = 1
 
         result = _edit_flow(mock_args, mock_log, mock_git)
 
         self.assertEqual(result, 1)
-        mock_done_flow.assert_called_once_with(mock_log, mock_git)
+        mock_done_flow.assert_called_once_with(mock_log, mock_git, check_stash=False)
 
     def test_stash_mode_cleanup_called_before_stash(self):
         """
         Tests that cleanup_stash is called before stash_staged in stash mode.
         """
-        mock_args = MagicMock(stash=True, commit="abc123")
-        mock_git = MagicMock()
-        mock_git.has_staged.return_value = Git.Result.SUCCESS
-        mock_git.stash_list.return_value = ""
-        mock_git.stash_staged.return_value = Git.Result.SUCCESS
-        mock_git.rebase_edit.return_value = Git.Result.SUCCESS
-        mock_git.pop_stash.return_value = Git.Result.SUCCESS
-        mock_git.amend_commit.return_value = Git.Result.SUCCESS
-        mock_git.continue_rebase.return_value = Git.Result.SUCCESS
+        mock_args = SimpleNamespace(stash=True, commit="abc123")
+        mock_git = make_mock_git()
         mock_log = MagicMock()
 
         _edit_flow(mock_args, mock_log, mock_git)
@@ -1,13 +1,26 @@
-from enum import Enum
+from enum import IntEnum
+import os
+import re
 import subprocess
 import shlex
-from typing import Optional, overload
+import sys
+from typing import Optional
 
 from lib.args import Args
 from lib.log import Log
 
 STASH_NAME = "git-re--stash"
 
+# Matches the stash list line of the entry created by git-re, capturing its ID
+_STASH_ENTRY_RE = re.compile(
+    rf"^(stash@\{{\d+\}}):[^\n]*{re.escape(STASH_NAME)}", re.MULTILINE
+)
+
+# Sequence editor script that marks the first commit of a rebase todo for editing
+TODO_EDITOR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "todo_editor.py"
+)
+
 
 class Git:
     """
@@ -17,7 +30,7 @@ class Git:
     methods return None.
     """
 
-    class Result(Enum):
+    class Result(IntEnum):
         FAILED = 0
         SUCCESS = 1
         DRY_RUN = 2
@@ -26,72 +39,92 @@ class Git:
         self.dry_run = args.dry_run
         self.log = log
 
-    @overload
-    def _run_git(self, cmd: list[str], expect_exitcode: int) -> Optional[Result]: ...
-
-    @overload
-    def _run_git(
-        self, cmd: list[str], expect_exitcode: None = None
-    ) -> Optional[subprocess.CompletedProcess[str]]: ...
-
-    def _run_git(
-        self, cmd: list[str], expect_exitcode: Optional[int] = None
-    ) -> Optional[subprocess.CompletedProcess[str] | Result]:
+    def _log_cmd(
+        self, full_cmd: list[str], env: Optional[dict[str, str]] = None
+    ) -> None:
         """
-        Executes a git command.
-
         Logs a debug message of the command prefixed with "> " normally, or "# "
-        in dry-run mode.
+        in dry-run mode. Extra environment variables are shown as shell-style
+        assignments before the command.
 
-        If expect_exitcode is provided, returns SUCCESS if the command's exit
-        code matches it, or FAILED otherwise.
+        Formatting is skipped entirely unless verbose mode is enabled.
         """
-        full_cmd = ["git"] + cmd
+        if not self.log.verbose:
+            return
 
         prefix = "# " if self.dry_run else "> "
-        formatted_cmd = " ".join(shlex.quote(part) for part in full_cmd)
+        formatted_cmd = " ".join(
+            [f"{name}={shlex.quote(value)}" for name, value in (env or {}).items()]
+            + [shlex.quote(part) for part in full_cmd]
+        )
         self.log.debug(f"{prefix}{formatted_cmd}")
 
+    def _run_git_status(
+        self, cmd: list[str], expect_exitcode: int, env: Optional[dict[str, str]] = None
+    ) -> Optional[Result]:
+        """
+        Executes a git command, logging it first (see _log_cmd). If env is
+        provided, its variables are set for the command.
+
+        Returns SUCCESS if the command's exit code matches expect_exitcode, or
+        FAILED otherwise. Only the exit code matters, so the command's output is
+        not captured; in verbose mode, git's errors are passed through.
+        """
+        full_cmd = ["git"] + cmd
+        self._log_cmd(full_cmd, env)
+
         if self.dry_run:
             return None
 
-        result: subprocess.CompletedProcess[str] = subprocess.run(
-            full_cmd, check=False, capture_output=True, text=True
+        returncode = subprocess.call(
+            full_cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=None if self.log.verbose else subprocess.DEVNULL,
+            env={**os.environ, **env} if env else None,
+        )
+        return (
+            Git.Result.SUCCESS if returncode == expect_exitcode else Git.Result.FAILED
         )
 
-        if expect_exitcode is not None:
-            return (
-                Git.Result.SUCCESS
-                if result.returncode == expect_exitcode
-                else Git.Result.FAILED
-            )
+    def _run_git_capture(
+        self, cmd: list[str]
+    ) -> Optional[subprocess.CompletedProcess[str]]:
+        """
+        Executes a git command, logging it first (see _log_cmd).
 
-        return result
+        Returns the completed process with its output captured.
+        """
+        full_cmd = ["git"] + cmd
+        self._log_cmd(full_cmd)
+
+        if self.dry_run:
+            return None
+
+        return subprocess.run(full_cmd, check=False, capture_output=True, text=True)
 
     def rebase_edit(self, commit: str) -> Result:
         """
         Starts an interactive rebase to edit the specified commit, without
         prompting the user to manually edit the todo list. This leaves the
         rebase in a state where the specified commit is ready to be amended.
+
+        The todo list is rewritten by TODO_EDITOR, passed through
+        GIT_SEQUENCE_EDITOR. Unlike `-c sequence.editor=...`, this takes
+        precedence over any sequence editor the user has configured.
         """
-        seq_editor = f"sed -i '' -e \"\\s/^pick /edit /\""
+        seq_editor = f"{shlex.quote(sys.executable)} {shlex.quote(TODO_EDITOR)}"
 
-        return self._run_git(
-            [
-                "-c",
-                f"sequence.editor={seq_editor}",
-                "rebase",
-                "-i",
-                f"{commit}^",
-            ],
+        return self._run_git_status(
+            ["rebase", "-i", f"{commit}^"],
             expect_exitcode=0,
+            env={"GIT_SEQUENCE_EDITOR": seq_editor},
         )
 
     def continue_rebase(self) -> Result:
         """
         Continues the current rebase operation.
         """
-        return self._run_git(
+        return self._run_git_status(
             ["rebase", "--continue"],
             expect_exitcode=0,
         )
@@ -100,7 +133,7 @@ class Git:
         """
         Aborts the current rebase operation.
         """
-        return self._run_git(
+        return self._run_git_status(
             ["rebase", "--abort"],
             expect_exitcode=0,
         )
@@ -109,13 +142,13 @@ class Git:
         """
         Returns SUCCESS if there are staged files in the git repository.
         """
-        return self._run_git(["diff", "--cached", "--quiet"], expect_exitcode=1)
+        return self._run_git_status(["diff", "--cached", "--quiet"], expect_exitcode=1)
 
     def stash_staged(self) -> Result:
         """
         Stashes the currently staged files.
         """
-        return self._run_git(
+        return self._run_git_status(
             ["stash", "push", "--keep-index", "-m", STASH_NAME],
             expect_exitcode=0,
         )
@@ -124,19 +157,33 @@ class Git:
         """
         Pops the most recent stash.
         """
-        return self._run_git(
+        return self._run_git_status(
             ["stash", "pop"],
             expect_exitcode=0,
         )
 
-    def stash_list(self) -> Optional[str]:
+    def has_stash(self) -> Result:
         """
-        Returns the stash list as a string. In dry-run mode, returns None.
+        Returns SUCCESS if the stash has any entries.
         """
-        result = self._run_git(
-            ["stash", "list"],
+        return self._run_git_status(
+            ["rev-parse", "--verify", "--quiet", "refs/stash"],
+            expect_exitcode=0,
         )
 
+    def stash_list(self) -> Optional[str]:
+        """
+        Returns the stash list as a string, one "<stash id>:<message>" entry
+        per line. In dry-run mode, returns None.
+
+        The stash is first checked for existence, so the common "no stash" case
+        only costs a single ref lookup.
+        """
+        if self.has_stash() == Git.Result.FAILED:
+            return ""
+
+        result = self._run_git_capture(["stash", "list", "--pretty=%gd:%gs"])
+
         if result is None:
             return None
 
@@ -146,7 +193,7 @@ class Git:
         """
         Drops the specified stash entry.
         """
-        return self._run_git(
+        return self._run_git_status(
             ["stash", "drop", stash_id],
             expect_exitcode=0,
         )
@@ -155,7 +202,7 @@ class Git:
         """
         Amends the current commit.
         """
-        return self._run_git(
+        return self._run_git_status(
             ["commit", "--amend", "--no-edit"],
             expect_exitcode=0,
         )
@@ -166,13 +213,12 @@ def _stash_id(git: Git) -> Optional[str]:
     Returns the stash ID of the entry created by git-re. If no such entry
     exists, returns None.
     """
-    list = git.stash_list()
-    if list is None:
+    stash_list = git.stash_list()
+    if stash_list is None:
         return None
 
-    for line in list.splitlines():
-        if STASH_NAME in line:
-            return line.split(":", 1)[0]
+    match = _STASH_ENTRY_RE.search(stash_list)
+    return match.group(1) if match else None
 
 
 def cleanup_stash(git: Git, log: Log) -> None:
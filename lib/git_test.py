@@ -1,8 +1,32 @@
-from textwrap import dedent
+import os
+import subprocess
+import tempfile
+from types import SimpleNamespace
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 from lib.git import Git, cleanup_stash, STASH_NAME
+from lib.testing import make_mock_git
+
+# Sample stash lists in the "<stash id>:<reflog subject>" format returned by
+# Git.stash_list
+_STASH_LIST_TOP = (
+    f"stash@{{0}}:On master: {STASH_NAME}\n"
+    "stash@{1}:WIP on master: 1a2b3c4 Add README\n"
+)
+_STASH_LIST_DEEP = (
+    "stash@{0}:On master: Better to ask forgiveness than permission\n"
+    "stash@{1}:WIP on master: 1a2b3c4 Add README\n"
+    f"stash@{{2}}:On master: {STASH_NAME}\n"
+    "stash@{3}:On main: We've always done it this way\n"
+)
+_STASH_LIST_NO_ENTRY = (
+    "stash@{0}:On master: Better to ask forgiveness than permission\n"
+    "stash@{1}:WIP on master: 1a2b3c4 Add README\n"
+    "stash@{2}:On master: Another stash\n"
+    "stash@{3}:On main: We've always done it this way\n"
+)
+_STASH_LIST_ONLY_ENTRY = f"stash@{{0}}:On master: {STASH_NAME}\n"
 
 
 class CleanupStashTest(unittest.TestCase):
@@ -11,12 +35,8 @@ class CleanupStashTest(unittest.TestCase):
         Tests the happy path where there is a leftover stash entry at the top of
         the stash stack.
         """
-        mock_git = MagicMock()
-        mock_git.stash_list.return_value = dedent(f"""\
-        stash@{{0}}: {STASH_NAME}
-        stash@{{1}}: WIP
-        """)
-        mock_git.drop_stash.return_value = Git.Result.SUCCESS
+        mock_git = make_mock_git()
+        mock_git.stash_list.return_value = _STASH_LIST_TOP
 
         cleanup_stash(mock_git, MagicMock())
 
@@ -28,14 +48,8 @@ class CleanupStashTest(unittest.TestCase):
         Tests the case where there is a leftover stash entry not at the top of
         the stash stack.
         """
-        mock_git = MagicMock()
-        mock_git.stash_list.return_value = dedent(f"""\
-        stash@{{0}}: Better to ask forgiveness than permission
-        stash@{{1}}: WIP
-        stash@{{2}}: {STASH_NAME}
-        stash@{{3}}: We've always done it this way
-        """)
-        mock_git.drop_stash.return_value = Git.Result.SUCCESS
+        mock_git = make_mock_git()
+        mock_git.stash_list.return_value = _STASH_LIST_DEEP
 
         cleanup_stash(mock_git, MagicMock())
 
@@ -46,7 +60,7 @@ class CleanupStashTest(unittest.TestCase):
         """
         Tests the case where there are no stash entries at all.
         """
-        mock_git = MagicMock()
+        mock_git = make_mock_git()
         mock_git.stash_list.return_value = ""
 
         cleanup_stash(mock_git, MagicMock())
@@ -58,13 +72,8 @@ class CleanupStashTest(unittest.TestCase):
         """
         Tests the case where there are stash entries, but none created by git-re.
         """
-        mock_git = MagicMock()
-        mock_git.stash_list.return_value = dedent(f"""\
-        stash@{{0}}: Better to ask forgiveness than permission
-        stash@{{1}}: WIP
-        stash@{{2}}: Another stash
-        stash@{{3}}: We've always done it this way
-        """)
+        mock_git = make_mock_git()
+        mock_git.stash_list.return_value = _STASH_LIST_NO_ENTRY
 
         cleanup_stash(mock_git, MagicMock())
 
@@ -75,7 +84,7 @@ class CleanupStashTest(unittest.TestCase):
         """
         Tests the case where the stash list command is run in dry-run mode.
         """
-        mock_git = MagicMock()
+        mock_git = make_mock_git()
         mock_git.stash_list.return_value = None
 
         cleanup_stash(mock_git, MagicMock())
@@ -87,7 +96,7 @@ class CleanupStashTest(unittest.TestCase):
         """
         Tests the case where the stash list command fails.
         """
-        mock_git = MagicMock()
+        mock_git = make_mock_git()
         mock_git.stash_list.return_value = "" # Empty stdout on failure
 
         cleanup_stash(mock_git, MagicMock())
@@ -99,10 +108,8 @@ class CleanupStashTest(unittest.TestCase):
         """
         Tests the case where dropping the stash entry fails.
         """
-        mock_git = MagicMock()
-        mock_git.stash_list.return_value = dedent(f"""\
-        stash@{{0}}: {STASH_NAME}
-        """)
+        mock_git = make_mock_git()
+        mock_git.stash_list.return_value = _STASH_LIST_ONLY_ENTRY
         mock_git.drop_stash.return_value = Git.Result.FAILED
 
         mock_log = MagicMock()
@@ -113,5 +120,72 @@ class CleanupStashTest(unittest.TestCase):
         mock_git.drop_stash.assert_called_once_with("stash@{0}")
         mock_log.error.assert_called_once() # Should output a warning message
 
+
+class StashListTest(unittest.TestCase):
+    def setUp(self):
+        self.git = Git(SimpleNamespace(dry_run=False), MagicMock())
+
+    def test_no_stash(self):
+        """
+        Tests that the stash is not listed when refs/stash does not exist.
+        """
+        with patch.object(
+            self.git, "_run_git_status", return_value=Git.Result.FAILED
+        ) as mock_status, patch.object(self.git, "_run_git_capture") as mock_capture:
+            self.assertEqual(self.git.stash_list(), "")
+
+        mock_status.assert_called_once_with(
+            ["rev-parse", "--verify", "--quiet", "refs/stash"], expect_exitcode=0
+        )
+        mock_capture.assert_not_called()
+
+    def test_lists_existing_stash(self):
+        """
+        Tests that an existing stash is listed as "<stash id>:<reflog subject>".
+        """
+        with patch.object(
+            self.git, "_run_git_status", return_value=Git.Result.SUCCESS
+        ), patch.object(self.git, "_run_git_capture") as mock_capture:
+            mock_capture.return_value.stdout = _STASH_LIST_TOP
+            self.assertEqual(self.git.stash_list(), _STASH_LIST_TOP)
+
+        mock_capture.assert_called_once_with(["stash", "list", "--pretty=%gd:%gs"])
+
+    def test_dry_run(self):
+        """
+        Tests that dry-run mode returns None.
+        """
+        with patch.object(
+            self.git, "_run_git_status", return_value=None
+        ), patch.object(self.git, "_run_git_capture", return_value=None):
+            self.assertIsNone(self.git.stash_list())
+
+
+class RebaseEditTest(unittest.TestCase):
+    def test_sequence_editor_marks_target_commit(self):
+        """
+        Tests that the sequence editor passed to git, run through a shell the
+        way git runs it, marks only the target commit for editing.
+        """
+        git = Git(SimpleNamespace(dry_run=False), MagicMock())
+        with patch.object(git, "_run_git_status") as mock_run:
+            git.rebase_edit("abc123")
+
+        self.assertEqual(mock_run.call_args[0][0], ["rebase", "-i", "abc123^"])
+        seq_editor = mock_run.call_args.kwargs["env"]["GIT_SEQUENCE_EDITOR"]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            todo = os.path.join(tmp, "git-rebase-todo")
+            with open(todo, "w") as f:
+                f.write("pick abc123 target\npick def456 next\n")
+
+            subprocess.run(
+                ["sh", "-c", f'{seq_editor} "$@"', seq_editor, todo], check=True
+            )
+
+            with open(todo) as f:
+                self.assertEqual(f.read(), "edit abc123 target\npick def456 next\n")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,29 @@
+"""
+Helpers shared by the *_test.py modules.
+"""
+
+from unittest.mock import MagicMock
+
+from lib.git import Git
+
+
+def make_mock_git() -> MagicMock:
+    """
+    Returns a mock Git where every command succeeds and there is no leftover
+    stash entry. Tests only override the return values that differ from this
+    happy path.
+    """
+    mock_git = MagicMock(spec=Git)
+    mock_git.stash_list.return_value = ""
+    for method in (
+        "rebase_edit",
+        "continue_rebase",
+        "abort_rebase",
+        "has_staged",
+        "stash_staged",
+        "pop_stash",
+        "drop_stash",
+        "amend_commit",
+    ):
+        getattr(mock_git, method).return_value = Git.Result.SUCCESS
+    return mock_git
@@ -0,0 +1,44 @@
+"""
+Sequence editor used by `git rebase -i` to mark the first commit of the todo
+list for editing.
+
+Run by git as `python todo_editor.py <todo-file>`. This is a plain script with
+no dependencies on the rest of git-re, so it starts as fast as possible.
+"""
+
+import sys
+
+# Todo commands that pick a commit, in long and abbreviated form
+PICK_COMMANDS = ("pick", "p")
+
+
+def mark_first_edit(todo: str) -> str:
+    """
+    Returns the todo list with its first "pick" command changed to "edit".
+    Other lines, including later picks and comments, are left untouched.
+    """
+    lines = todo.splitlines(keepends=True)
+
+    for i, line in enumerate(lines):
+        command, sep, rest = line.partition(" ")
+        if sep and command in PICK_COMMANDS:
+            lines[i] = f"edit {rest}"
+            break
+
+    return "".join(lines)
+
+
+def main(path: str) -> None:
+    # git writes commit subjects as raw bytes (normally UTF-8), regardless of
+    # the locale. Round-trip them untouched, including any line endings.
+    with open(path, encoding="utf-8", errors="surrogateescape", newline="") as f:
+        todo = f.read()
+
+    with open(
+        path, "w", encoding="utf-8", errors="surrogateescape", newline=""
+    ) as f:
+        f.write(mark_first_edit(todo))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1])
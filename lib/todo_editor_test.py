@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+
+from lib.todo_editor import main, mark_first_edit
+
+
+class MarkFirstEditTest(unittest.TestCase):
+    def test_marks_only_first_pick(self):
+        """
+        Tests that only the first commit in the todo list is marked for editing.
+        """
+        todo = "pick abc123 first\npick def456 second\npick 789abc third\n"
+
+        self.assertEqual(
+            mark_first_edit(todo),
+            "edit abc123 first\npick def456 second\npick 789abc third\n",
+        )
+
+    def test_abbreviated_commands(self):
+        """
+        Tests the todo list format used with rebase.abbreviateCommands.
+        """
+        todo = "p abc123 first\np def456 second\n"
+
+        self.assertEqual(mark_first_edit(todo), "edit abc123 first\np def456 second\n")
+
+    def test_keeps_comments(self):
+        """
+        Tests that comments and blank lines are left untouched.
+        """
+        todo = "pick abc123 first\n\n# Rebase 0123456..abc123 onto 0123456\n# pick ...\n"
+
+        self.assertEqual(
+            mark_first_edit(todo),
+            "edit abc123 first\n\n# Rebase 0123456..abc123 onto 0123456\n# pick ...\n",
+        )
+
+    def test_no_picks(self):
+        """
+        Tests that a todo list without any picks (e.g. "noop") is unchanged.
+        """
+        todo = "noop\n\n# Rebase 0123456..0123456 onto 0123456\n"
+
+        self.assertEqual(mark_first_edit(todo), todo)
+
+    def test_non_ascii_subject(self):
+        """
+        Tests that a todo file with a non-ASCII commit subject is rewritten
+        byte for byte, whatever the locale's default encoding.
+        """
+        todo = "pick abc123 Ändern: Á\r\npick def456 wörk\r\n".encode("utf-8")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "git-rebase-todo")
+            with open(path, "wb") as f:
+                f.write(todo)
+
+            main(path)
+
+            with open(path, "rb") as f:
+                self.assertEqual(
+                    f.read(), todo.replace(b"pick abc123", b"edit abc123", 1)
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()